@@ -2,19 +2,27 @@
 # A satirical project to replace CEOs with AI
 
 import os
-from typing import Dict, List, Any, Annotated, TypedDict, Literal
+from typing import Dict, List, Any, Annotated, Iterator, TypedDict, Literal, Optional
 from dotenv import load_dotenv
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import httpx
 
 # LangGraph imports
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolExecutor
-from langgraph.prebuilt.tool_node import ToolNode
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langgraph.prebuilt import ToolExecutor, ToolInvocation
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.tools import BaseTool, tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import ChatOpenAI
 
+from session_state import SessionState, payload_store
+
 # Load environment variables
 load_dotenv()
 
@@ -22,13 +30,46 @@ load_dotenv()
 class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], "Messages sent so far"]
     next: Annotated[str, "Next node to route to"]
+    speculation: Annotated[Optional["SpeculativePrefetch"], "Tool calls started ahead of the model"]
+
+# Model configuration (see .env.example)
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o")
+TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+MAX_TOKENS = int(os.getenv("MAX_TOKENS")) if os.getenv("MAX_TOKENS") else None
+
+# Optional small model for turns that only pick the next tool
+ROUTER_MODEL_NAME = os.getenv("ROUTER_MODEL_NAME")
+ROUTER_TEMPERATURE = float(os.getenv("ROUTER_TEMPERATURE", "0.0"))
+# Tool calls carry the whole company data as arguments, so the router gets the same budget by default
+ROUTER_MAX_TOKENS = int(os.getenv("ROUTER_MAX_TOKENS")) if os.getenv("ROUTER_MAX_TOKENS") else MAX_TOKENS
+
+# Connection pool shared by every model client in this process
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    ),
+    timeout=LLM_TIMEOUT,
+)
 
 # Initialize LLM
 llm = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0.7,
+    model=MODEL_NAME,
+    temperature=TEMPERATURE,
+    max_tokens=MAX_TOKENS,
+    http_client=http_client,
 )
 
+# Initialize the router LLM (only when tiered routing is configured)
+router_llm = ChatOpenAI(
+    model=ROUTER_MODEL_NAME,
+    temperature=ROUTER_TEMPERATURE,
+    max_tokens=ROUTER_MAX_TOKENS,
+    http_client=http_client,
+) if ROUTER_MODEL_NAME else None
+
 # ========== FINANCIAL OPTIMIZATION TOOLS ==========
 
 @tool
@@ -454,10 +495,440 @@ tools = [
 tool_executor = ToolExecutor(tools)
 
 # Create a list of available tools for our agent
-available_tools = [{"type": "function", "function": tool.dict()} for tool in tools]
+available_tools = [convert_to_openai_tool(tool) for tool in tools]
+
+# ========== SPECULATIVE TOOL PREFETCH ==========
+
+# Opt-in: start the tools the model almost always asks for while the first LLM turn is in flight
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "False").lower() in ("1", "true", "yes")
+SPECULATION_WORKERS = int(os.getenv("SPECULATION_WORKERS", "4"))
+
+# Tools predicted from the task type (keyed by CEOKarmaAI task method)
+TASK_TOOL_PREDICTIONS = {
+    "analyze_company": ["budget_slasher", "compensation_equalizer", "expense_auditor"],
+    "optimize_executive_compensation": ["compensation_equalizer", "executive_performance_evaluator"],
+    "restructure_decision_making": ["worker_consultant", "ethics_checker"],
+    "implement_worker_centric_policies": ["fairness_monitor", "workload_distributor"],
+}
+
+# Tools predicted from the shape of the company data (top-level JSON keys)
+INPUT_TOOL_PREDICTIONS = {
+    "executive_structure": ["executive_performance_evaluator"],
+    "executive_compensation": ["compensation_equalizer"],
+    "recent_layoffs": ["layoff_preventer"],
+    "cost_cutting_measures": ["budget_slasher"],
+    "stock_buyback_program": ["shareholder_rebalancer"],
+    "perks": ["expense_auditor"],
+}
+
+tools_by_name = {tool.name: tool for tool in tools}
+
+_speculation_pool: Optional[ThreadPoolExecutor] = None
+_speculation_pool_lock = threading.Lock()
+
+def _get_speculation_pool() -> ThreadPoolExecutor:
+    """Lazily create the thread pool shared by all speculative tool calls."""
+    global _speculation_pool
+    with _speculation_pool_lock:
+        if _speculation_pool is None:
+            _speculation_pool = ThreadPoolExecutor(
+                max_workers=SPECULATION_WORKERS,
+                thread_name_prefix="ceo-karma-speculation",
+            )
+        return _speculation_pool
+
+def extract_company_data(request: str) -> Optional[str]:
+    """
+    Return the JSON object appended to a request, or None if it has none.
+    """
+    start = request.find("{")
+    if start == -1:
+        return None
+    try:
+        payload = json.loads(request[start:])
+    except ValueError:
+        return None
+    return request[start:] if isinstance(payload, dict) else None
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Canonical form of tool arguments, so a reformatted JSON payload still matches.
+    """
+    normalized = {}
+    for key, value in arguments.items():
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = value.strip()
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+def predict_tool_calls(task: Optional[str], request: str) -> List[str]:
+    """
+    Predict which tools the first model turn will request.
+
+    Only tools with a single argument are predicted, since that argument is
+    the one thing a prefetch can fill in: the company data.
+
+    Args:
+        task: Name of the CEOKarmaAI task method, or None for free-form requests
+        request: Content of the opening human message
+
+    Returns:
+        Names of the tools worth starting ahead of the model, in prediction order
+    """
+    predicted = list(TASK_TOOL_PREDICTIONS.get(task, []))
 
-# Create a node for tool execution
-tool_node = ToolNode(tool_executor)
+    # The company data is appended after the instruction, usually as a JSON object
+    company_data = extract_company_data(request)
+    if company_data is not None:
+        payload = json.loads(company_data)
+        for key, tool_names in INPUT_TOOL_PREDICTIONS.items():
+            if key in payload or any(isinstance(v, dict) and key in v for v in payload.values()):
+                predicted.extend(tool_names)
+
+    # Keep the first occurrence of each known single-argument tool
+    return [
+        name for i, name in enumerate(predicted)
+        if name in tools_by_name and len(tools_by_name[name].args) == 1 and name not in predicted[:i]
+    ]
+
+class SpeculationStats:
+    """Process-wide counters for speculative tool prefetching."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all counters."""
+        with self._lock:
+            self.predicted = 0
+            self.hits = 0
+            self.misses = 0
+            self.mismatches = 0
+            self.late = 0
+            self.wasted = 0
+            self.wasted_seconds = 0.0
+            self.saved_seconds = 0.0
+            self.lost_seconds = 0.0
+            self.speculative_runs = 0
+            self.speculative_seconds = 0.0
+            self.plain_runs = 0
+            self.plain_seconds = 0.0
+
+    def record(self, **deltas):
+        """Add the given amounts to the named counters."""
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def record_run(self, speculative: bool, seconds: float):
+        """Add the wall time of one graph run, with or without prefetching."""
+        if speculative:
+            self.record(speculative_runs=1, speculative_seconds=seconds)
+        else:
+            self.record(plain_runs=1, plain_seconds=seconds)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of model-requested tool calls served from a prefetch."""
+        requested = self.hits + self.misses
+        return self.hits / requested if requested else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return {
+                "predicted": self.predicted,
+                "hits": self.hits,
+                "misses": self.misses,
+                "mismatches": self.mismatches,
+                "late": self.late,
+                "wasted": self.wasted,
+                "hit_rate": round(self.hit_rate, 3),
+                "wasted_seconds": round(self.wasted_seconds, 3),
+                "saved_seconds": round(self.saved_seconds, 3),
+                "lost_seconds": round(self.lost_seconds, 3),
+                "speculative_runs": self.speculative_runs,
+                "avg_speculative_run_seconds": round(
+                    self.speculative_seconds / self.speculative_runs, 3
+                ) if self.speculative_runs else 0.0,
+                "plain_runs": self.plain_runs,
+                "avg_plain_run_seconds": round(
+                    self.plain_seconds / self.plain_runs, 3
+                ) if self.plain_runs else 0.0,
+            }
+
+speculation_stats = SpeculationStats()
+
+class SpeculativePrefetch:
+    """
+    Tool calls started for a single graph run before the model asked for them.
+
+    Each predicted tool is run with the company data as its only argument.
+    A prefetched result is served only to a tool call whose normalized
+    arguments match; any other call to that tool counts as a mismatch.
+    """
+
+    def __init__(self, company_data: str, tool_names: List[str]):
+        self._lock = threading.Lock()
+        self._futures: Dict[tuple, Future] = {}
+        self._durations: Dict[tuple, float] = {}
+        pool = _get_speculation_pool()
+        for name in tool_names:
+            arguments = {next(iter(tools_by_name[name].args)): company_data}
+            key = (name, normalize_arguments(arguments))
+            self._futures[key] = pool.submit(self._run, key, name, arguments)
+        speculation_stats.record(predicted=len(tool_names))
+
+    def _run(self, key: tuple, name: str, arguments: Dict[str, Any]) -> str:
+        started = time.perf_counter()
+        try:
+            return tools_by_name[name].invoke(arguments)
+        finally:
+            self._durations[key] = time.perf_counter() - started
+
+    def claim(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Take the prefetched result for a tool call, waiting for it if still running.
+
+        A prefetch still queued behind other runs' prefetches is cancelled
+        instead, so the caller runs the tool inline rather than waiting.
+
+        Args:
+            name: Tool the model asked for
+            arguments: Arguments the model sent
+
+        Returns:
+            The tool output, or None if no prefetch matches the call or it failed
+        """
+        key = (name, normalize_arguments(arguments))
+        with self._lock:
+            future = self._futures.pop(key, None)
+            mismatch = future is None and any(other == name for other, _ in self._futures)
+        if future is None:
+            speculation_stats.record(misses=1, mismatches=int(mismatch))
+            return None
+        if future.cancel():
+            speculation_stats.record(misses=1, late=1)
+            return None
+        started = time.perf_counter()
+        try:
+            result = future.result()
+        except Exception:
+            speculation_stats.record(misses=1)
+            return None
+        waited = time.perf_counter() - started
+        # Compared with running inline: the overlap with the model turn is saved,
+        # and any wait beyond the tool's own run time is lost
+        duration = self._durations.get(key, 0.0)
+        speculation_stats.record(
+            hits=1,
+            saved_seconds=max(0.0, duration - waited),
+            lost_seconds=max(0.0, waited - duration),
+        )
+        return result
+
+    def finish(self):
+        """Cancel or write off every prefetch the model never asked for."""
+        with self._lock:
+            leftovers, self._futures = self._futures, {}
+        for key, future in leftovers.items():
+            if future.cancel():
+                speculation_stats.record(wasted=1)
+            else:
+                future.add_done_callback(
+                    lambda _, key=key: speculation_stats.record(
+                        wasted=1, wasted_seconds=self._durations.get(key, 0.0)
+                    )
+                )
+
+def start_speculation(messages: List[BaseMessage], task: Optional[str] = None) -> Optional[SpeculativePrefetch]:
+    """Start prefetching tools for a run whose newest message is the request."""
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    request = messages[-1].content
+    company_data = extract_company_data(request)
+    tool_names = predict_tool_calls(task, request)
+    if company_data is None or not tool_names:
+        return None
+    return SpeculativePrefetch(company_data, tool_names)
+
+def execute_tools(state: AgentState) -> AgentState:
+    """
+    Run the tools requested by the last AI message, using prefetched results when available.
+    """
+    messages = state["messages"]
+    speculation = state.get("speculation")
+    tool_messages = []
+    for tool_call in messages[-1].additional_kwargs["tool_calls"]:
+        name = tool_call["function"]["name"]
+        arguments = json.loads(tool_call["function"]["arguments"])
+        output = speculation.claim(name, arguments) if speculation is not None else None
+        if output is None:
+            output = tool_executor.invoke(ToolInvocation(tool=name, tool_input=arguments))
+        # Reports already held by a live session are shared rather than duplicated
+        tool_messages.append(
+            ToolMessage(content=payload_store.intern(str(output)), name=name, tool_call_id=tool_call["id"])
+        )
+
+    # Copy-on-write: the caller's message list is left untouched
+    return {"messages": messages + tool_messages, "next": ""}
+
+# ========== MODEL TIER ROUTING ==========
+
+# USD per 1M (input, output) tokens, used for the per-tier cost report
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+class TierStats:
+    """Call, latency, token and cost counters for one model tier."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, seconds: float, response: BaseMessage):
+        """Add one model call and its token usage."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if not usage:
+            token_usage = response.response_metadata.get("token_usage", {})
+            usage = {
+                "input_tokens": token_usage.get("prompt_tokens", 0),
+                "output_tokens": token_usage.get("completion_tokens", 0),
+            }
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+
+    @property
+    def cost(self) -> float:
+        """Estimated spend in USD, zero for models without a known price."""
+        input_price, output_price = MODEL_PRICES.get(self.model_name, (0.0, 0.0))
+        return (self.input_tokens * input_price + self.output_tokens * output_price) / 1_000_000
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "calls": self.calls,
+                "avg_latency_seconds": round(self.seconds / self.calls, 3) if self.calls else 0.0,
+                "total_seconds": round(self.seconds, 3),
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "cost_usd": round(self.cost, 6),
+            }
+
+def _model_name(model: Any) -> str:
+    return getattr(model, "model_name", None) or type(model).__name__
+
+def valid_tool_calls(response: BaseMessage) -> bool:
+    """
+    Check that a response requests at least one known tool with well-formed arguments.
+    """
+    if getattr(response, "invalid_tool_calls", None):
+        return False
+    tool_calls = response.additional_kwargs.get("tool_calls")
+    if not tool_calls:
+        return False
+    for tool_call in tool_calls:
+        function = tool_call.get("function", {})
+        selected_tool = tools_by_name.get(function.get("name"))
+        if selected_tool is None:
+            return False
+        try:
+            arguments = json.loads(function.get("arguments") or "{}")
+        except ValueError:
+            return False
+        if not isinstance(arguments, dict) or not set(selected_tool.args) <= set(arguments):
+            return False
+    return True
+
+class ModelTierPolicy:
+    """
+    Send tool-selection turns to a small router model and the final report to the large model.
+
+    A turn counts as tool selection until the first tool results for the latest
+    request come back; earlier turns of a session do not count. The router's
+    answer is kept only if it is a valid tool call; a malformed call, a failed
+    router request or an attempt to write the report itself falls back to the
+    large model.
+    """
+
+    def __init__(self, synthesis_model: Any, router_model: Optional[Any] = None):
+        self.synthesis_model = synthesis_model
+        self.router_model = router_model
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear the per-tier counters."""
+        self.tiers = {"synthesis": TierStats(_model_name(self.synthesis_model))}
+        if self.router_model is not None:
+            self.tiers["router"] = TierStats(_model_name(self.router_model))
+        self.fallbacks = 0
+        self.escalations = 0
+
+    def _call(self, tier: str, model: Any, prompt: List[Any]) -> BaseMessage:
+        started = time.perf_counter()
+        response = model.invoke(prompt, tools=available_tools)
+        self.tiers[tier].record(time.perf_counter() - started, response)
+        return response
+
+    def invoke(self, messages: List[BaseMessage], prompt: List[Any]) -> BaseMessage:
+        """
+        Get the next response for a run, choosing the model tier from its progress.
+
+        Args:
+            messages: Messages of the run so far
+            prompt: The prompt to send, system prompt included
+
+        Returns:
+            The model response
+        """
+        # Only the messages since the latest request tell whether tools have run yet
+        latest_request = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1
+        )
+        tool_selection = not any(isinstance(m, ToolMessage) for m in messages[latest_request + 1:])
+        if self.router_model is not None and tool_selection:
+            try:
+                response = self._call("router", self.router_model, prompt)
+            except Exception:
+                # The large model can still answer if the router is down or rate limited
+                response = None
+            if response is not None and valid_tool_calls(response):
+                return response
+            failed = response is None or bool(
+                response.additional_kwargs.get("tool_calls") or getattr(response, "invalid_tool_calls", None)
+            )
+            with self._lock:
+                if failed:
+                    self.fallbacks += 1
+                else:
+                    self.escalations += 1
+        return self._call("synthesis", self.synthesis_model, prompt)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return per-tier cost/latency and how often the router was overruled."""
+        return {
+            "tiers": {name: stats.as_dict() for name, stats in self.tiers.items()},
+            "fallbacks": self.fallbacks,
+            "escalations": self.escalations,
+        }
+
+model_policy = ModelTierPolicy(llm, router_llm)
 
 # System prompt for CEO Karma AI
 SYSTEM_PROMPT = """You are CEO Karma AI, an advanced agent designed to replace corporate executives with more efficient, fair, and ethical AI decision-making.
@@ -508,17 +979,15 @@ def get_agent_response(state: AgentState) -> AgentState:
     """
     messages = state["messages"]
     
-    # Get response from the model
-    response = llm.invoke(
-        [
-            ("system", SYSTEM_PROMPT),
-            *[(m.type, m.content) for m in messages],
-        ],
-        tools=available_tools
+    # Get response from the model tier suited to this turn; the messages are passed
+    # whole so tool calls and the tool_call_id of their results reach the model
+    response = model_policy.invoke(
+        messages,
+        [SystemMessage(content=SYSTEM_PROMPT), *messages],
     )
     
-    # Add the response to the messages
-    messages.append(response)
+    # Add the response to a new message list, leaving the caller's list untouched
+    messages = [*messages, response]
     
     # Decide next step
     return decide_next_step({"messages": messages, "next": ""})
@@ -528,7 +997,7 @@ workflow = StateGraph(AgentState)
 
 # Add nodes
 workflow.add_node("agent", get_agent_response)
-workflow.add_node("tool_node", tool_node)
+workflow.add_node("tool_node", execute_tools)
 
 # Add edges
 workflow.set_entry_point("agent")
@@ -545,13 +1014,103 @@ workflow.add_edge("tool_node", "agent")
 # Compile the graph
 ceo_karma_agent = workflow.compile()
 
+# Opening request for each CEOKarmaAI task
+TASK_PROMPTS = {
+    "analyze_company": "Please analyze this company and identify how executives can be replaced with AI: {data}",
+    "optimize_executive_compensation": "Please analyze and optimize this executive compensation structure to ensure fairness: {data}",
+    "restructure_decision_making": "Please restructure this corporate decision-making process to be more equitable and efficient: {data}",
+    "implement_worker_centric_policies": "Please transform these corporate policies to prioritize worker wellbeing: {data}",
+}
+
+# Interactions kept by each CEOKarmaAI instance (0 keeps none)
+HISTORY_LIMIT = int(os.getenv("HISTORY_LIMIT", "100"))
+
 class CEOKarmaAI:
-    def __init__(self):
-        """Initialize the CEO Karma AI."""
+    def __init__(self, history_limit: int = HISTORY_LIMIT):
+        """
+        Initialize the CEO Karma AI.
+        
+        Args:
+            history_limit: Most recent interactions to keep in the history
+        """
         self.agent = ceo_karma_agent
-        self.history = []
+        self.history = deque(maxlen=history_limit)
         print("CEO Karma AI initialized - ready to replace executives!")
     
+    @contextmanager
+    def _agent_run(self, messages: List[BaseMessage], task: Optional[str] = None) -> Iterator[AgentState]:
+        """
+        Prepare the graph input for a run, prefetching likely tools if enabled.
+        
+        Yields:
+            The state to invoke or stream the graph with; the prefetches are
+            settled and the run timed when the block exits, however it exits
+        """
+        # Start the likely tools before the first model turn is in flight
+        speculation = start_speculation(messages, task) if SPECULATIVE_PREFETCH else None
+        started = time.perf_counter()
+        try:
+            yield {"messages": messages, "next": "", "speculation": speculation}
+        finally:
+            # Whatever happened to the run, unclaimed prefetches are cancelled or written off
+            if speculation is not None:
+                speculation.finish()
+            speculation_stats.record_run(speculation is not None, time.perf_counter() - started)
+    
+    def _invoke_agent(self, messages: List[BaseMessage], task: Optional[str] = None) -> AgentState:
+        """
+        Run the graph on the given messages.
+        """
+        with self._agent_run(messages, task) as state:
+            return self.agent.invoke(state)
+    
+    def _remember(self, data: str, output: Optional[str]):
+        """Store an interaction in the history."""
+        self.history.append({
+            "timestamp": datetime.now().isoformat(),
+            "input": data,
+            "output": output
+        })
+    
+    def stream_task(self, task: str, data: str) -> Iterator[Dict[str, Any]]:
+        """
+        Run a task and yield what each graph node produced as it finishes.
+        
+        Args:
+            task: Name of a CEOKarmaAI task method, e.g. "analyze_company"
+            data: The input that method takes
+            
+        Yields:
+            Events: "tool_calls" when the model asks for tools, one "tool_report"
+            per finished tool, and "memo" with the final report
+        """
+        messages = [HumanMessage(content=TASK_PROMPTS[task].format(data=data))]
+        memo = None
+        
+        with self._agent_run(messages, task) as state:
+            for step in self.agent.stream(state):
+                for node, update in step.items():
+                    if node == "agent":
+                        response = update["messages"][-1]
+                        tool_calls = response.additional_kwargs.get("tool_calls")
+                        if tool_calls:
+                            yield {"event": "tool_calls", "tools": [c["function"]["name"] for c in tool_calls]}
+                        else:
+                            memo = response.content
+                            yield {"event": "memo", "content": memo}
+                    elif node == "tool_node":
+                        # The node returns the whole conversation; its reports are the trailing ToolMessages
+                        reports = []
+                        for message in reversed(update["messages"]):
+                            if not isinstance(message, ToolMessage):
+                                break
+                            reports.append(message)
+                        for report in reversed(reports):
+                            yield {"event": "tool_report", "tool": report.name, "content": report.content}
+        
+        # Store interaction in history
+        self._remember(data, memo)
+    
     def analyze_company(self, company_data: str) -> str:
         """
         Analyze a company and provide recommendations for executive replacement.
@@ -563,17 +1122,13 @@ class CEOKarmaAI:
             A comprehensive analysis and replacement plan
         """
         # Create input for the agent
-        input_message = HumanMessage(content=f"Please analyze this company and identify how executives can be replaced with AI: {company_data}")
+        input_message = HumanMessage(content=TASK_PROMPTS["analyze_company"].format(data=company_data))
         
         # Invoke the agent
-        result = self.agent.invoke({"messages": [input_message], "next": ""})
+        result = self._invoke_agent([input_message], "analyze_company")
         
         # Store interaction in history
-        self.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "input": company_data,
-            "output": result["messages"][-1].content
-        })
+        self._remember(company_data, result["messages"][-1].content)
         
         return result["messages"][-1].content
     
@@ -588,17 +1143,13 @@ class CEOKarmaAI:
             A restructuring plan for fair compensation
         """
         # Create input for the agent
-        input_message = HumanMessage(content=f"Please analyze and optimize this executive compensation structure to ensure fairness: {compensation_data}")
+        input_message = HumanMessage(content=TASK_PROMPTS["optimize_executive_compensation"].format(data=compensation_data))
         
         # Invoke the agent
-        result = self.agent.invoke({"messages": [input_message], "next": ""})
+        result = self._invoke_agent([input_message], "optimize_executive_compensation")
         
         # Store interaction in history
-        self.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "input": compensation_data,
-            "output": result["messages"][-1].content
-        })
+        self._remember(compensation_data, result["messages"][-1].content)
         
         return result["messages"][-1].content
     
@@ -613,17 +1164,13 @@ class CEOKarmaAI:
             A plan for more equitable and efficient decision-making
         """
         # Create input for the agent
-        input_message = HumanMessage(content=f"Please restructure this corporate decision-making process to be more equitable and efficient: {current_process}")
+        input_message = HumanMessage(content=TASK_PROMPTS["restructure_decision_making"].format(data=current_process))
         
         # Invoke the agent
-        result = self.agent.invoke({"messages": [input_message], "next": ""})
+        result = self._invoke_agent([input_message], "restructure_decision_making")
         
         # Store interaction in history
-        self.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "input": current_process,
-            "output": result["messages"][-1].content
-        })
+        self._remember(current_process, result["messages"][-1].content)
         
         return result["messages"][-1].content
     
@@ -638,23 +1185,47 @@ class CEOKarmaAI:
             Worker-centric policy recommendations
         """
         # Create input for the agent
-        input_message = HumanMessage(content=f"Please transform these corporate policies to prioritize worker wellbeing: {current_policies}")
+        input_message = HumanMessage(content=TASK_PROMPTS["implement_worker_centric_policies"].format(data=current_policies))
         
         # Invoke the agent
-        result = self.agent.invoke({"messages": [input_message], "next": ""})
+        result = self._invoke_agent([input_message], "implement_worker_centric_policies")
         
         # Store interaction in history
-        self.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "input": current_policies,
-            "output": result["messages"][-1].content
-        })
+        self._remember(current_policies, result["messages"][-1].content)
         
         return result["messages"][-1].content
     
+    def continue_session(self, session: SessionState, message: str) -> SessionState:
+        """
+        Run one turn of a multi-turn session.
+        
+        Args:
+            session: Compact state of the session so far (use SessionState() to start one)
+            message: The next request in the conversation
+            
+        Returns:
+            A new session state ending with the agent's reply; the given state is unchanged
+        """
+        # Rebuild the conversation for this run only
+        messages = [*session.to_messages(), HumanMessage(content=message)]
+        
+        # Invoke the agent
+        result = self._invoke_agent(messages)
+        
+        # Compact the new messages; the session state itself is the record, nothing goes to history
+        return session.extend_messages(result["messages"][len(session):])
+    
     def get_history(self) -> List[Dict]:
         """Return the history of interactions with the agent."""
-        return self.history
+        return list(self.history)
+    
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Return hit rate and wasted work of speculative tool prefetching."""
+        return speculation_stats.as_dict()
+    
+    def get_model_tier_stats(self) -> Dict[str, Any]:
+        """Return cost and latency per model tier."""
+        return model_policy.as_dict()
 
 # Example usage
 if __name__ == "__main__":
@@ -724,3 +1295,10 @@ if __name__ == "__main__":
     print("\nOptimizing executive compensation...")
     optimization = ceo_karma.optimize_executive_compensation(compensation_data)
     print(optimization)
+    
+    print("\nModel tier stats:")
+    print(json.dumps(ceo_karma.get_model_tier_stats(), indent=2))
+    
+    if SPECULATIVE_PREFETCH:
+        print("\nSpeculative prefetch stats:")
+        print(json.dumps(ceo_karma.get_speculation_stats(), indent=2))
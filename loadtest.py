@@ -0,0 +1,190 @@
+# CEO Karma AI - Local Load Test
+# Runs the HTTP service against a fake LLM and reports throughput and latency per worker count
+#
+#   python loadtest.py --workers 1 2 4 --requests 400 --concurrency 64
+
+import os
+import argparse
+import asyncio
+import json
+import math
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+class FakeChatModel:
+    """
+    Stand-in for ChatOpenAI that answers after a fixed delay without calling the network.
+
+    Like a real run, each request takes one tool round: the first turn asks for
+    two tools and the turn after their reports writes the memo.
+    """
+
+    model_name = "fake"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, prompt: List[Any], **kwargs) -> Any:
+        from langchain_core.messages import AIMessage, ToolMessage
+
+        # Blocking sleep, like the synchronous OpenAI client it replaces
+        time.sleep(self.latency)
+        usage = {"token_usage": {"prompt_tokens": 600, "completion_tokens": 120}}
+        if not isinstance(prompt[-1], ToolMessage):
+            return AIMessage(content="", response_metadata=usage, additional_kwargs={"tool_calls": [
+                {
+                    "id": f"call_{index}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps({argument: "see company data"})},
+                }
+                for index, (name, argument) in enumerate([
+                    ("budget_slasher", "company_financial_data"),
+                    ("compensation_equalizer", "company_salary_data"),
+                ])
+            ]})
+        return AIMessage(content="FAKE REPORT: the C-Suite has been automated.", response_metadata=usage)
+
+def create_fake_app():
+    """uvicorn factory: the real service with every model tier replaced by FakeChatModel."""
+    import ceo_karma_ai
+    import server
+
+    fake = FakeChatModel(float(os.getenv("FAKE_LLM_LATENCY", "0.05")))
+    ceo_karma_ai.model_policy = ceo_karma_ai.ModelTierPolicy(fake)
+    return server.app
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_load(
+    base_url: str,
+    total: int,
+    concurrency: int,
+    stream: bool,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    """Fire total requests with at most concurrency in flight and collect latencies."""
+    payload = {"data": json.dumps({"name": "MegaCorp Industries", "recent_layoffs": 500})}
+    path = "/v1/analyze-company/stream" if stream else "/v1/analyze-company"
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(total))
+
+    async def request(client: httpx.AsyncClient) -> int:
+        if not stream:
+            return (await client.post(path, json=payload)).status_code
+        async with client.stream("POST", path, json=payload) as response:
+            last_event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    last_event = line[len("event: "):]
+            # A stream only succeeded if the graph ran to the end; "error" arrives with a 200 too
+            return response.status_code if response.status_code != 200 or last_event == "done" else 0
+
+    async def client_loop(client: httpx.AsyncClient):
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await request(client)
+            except httpx.HTTPError:
+                status = 0
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120, transport=transport) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "ok": len(latencies),
+        "statuses": statuses,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50) if latencies else 0.0,
+        "p95": percentile(latencies, 0.95) if latencies else 0.0,
+        "p99": percentile(latencies, 0.99) if latencies else 0.0,
+        "mean": statistics.mean(latencies) if latencies else 0.0,
+    }
+
+def wait_until_healthy(base_url: str, timeout: float = 30.0):
+    """Poll /health until the service answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Service at {base_url} did not become healthy")
+
+def benchmark(workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake-LLM service with the given worker count, load it and shut it down."""
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "fake")
+    env["FAKE_LLM_LATENCY"] = str(args.latency)
+    env["API_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    env["API_MAX_QUEUE"] = str(args.max_queue)
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "loadtest:create_fake_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        # Own process group, so the supervisor and its workers can be killed together
+        start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_healthy(base_url)
+        asyncio.run(run_load(base_url, min(args.concurrency, args.requests), args.concurrency, args.stream))  # warm-up
+        return asyncio.run(run_load(base_url, args.requests, args.concurrency, args.stream))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=args.latency * args.requests + 30)
+        except subprocess.TimeoutExpired:
+            # Don't leave uvicorn workers behind if the graceful drain hangs
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the CEO Karma AI service against a fake LLM")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--requests", type=int, default=400, help="requests per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="API_MAX_CONCURRENCY per worker")
+    parser.add_argument("--max-queue", type=int, default=32, help="API_MAX_QUEUE per worker")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stream", action="store_true", help="use the server-sent events endpoint")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'ok':>6} {'429':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        report = benchmark(workers, args)
+        print(
+            f"{workers:>7} {report['ok']:>6} {report['statuses'].get(429, 0):>5} {report['rps']:>8.1f} "
+            f"{report['p50'] * 1000:>8.1f} {report['p95'] * 1000:>8.1f} {report['p99'] * 1000:>8.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+# CEO Karma AI - HTTP API Service
+# Serves the CEOKarmaAI methods with FastAPI and uvicorn
+
+import os
+import asyncio
+import json
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+import uvicorn
+
+import ceo_karma_ai
+from ceo_karma_ai import CEOKarmaAI
+
+# Load environment variables
+load_dotenv()
+
+# Server configuration (see .env.example)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+ENABLE_CORS = os.getenv("ENABLE_CORS", "False").lower() in ("1", "true", "yes")
+
+# Per-worker admission limits: graph runs executing at once, and requests allowed to wait for one
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "8"))
+API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "32"))
+API_DRAIN_TIMEOUT = float(os.getenv("API_DRAIN_TIMEOUT", "30"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+logger = logging.getLogger("uvicorn.error")
+
+# URL names for the CEOKarmaAI methods
+TASKS = {
+    "analyze-company": "analyze_company",
+    "optimize-compensation": "optimize_executive_compensation",
+    "restructure-decision-making": "restructure_decision_making",
+    "worker-centric-policies": "implement_worker_centric_policies",
+}
+
+class TaskRequest(BaseModel):
+    data: str
+
+class RequestGate:
+    """
+    Bounded admission for graph runs in one worker.
+
+    Up to max_concurrency runs execute on the thread pool and up to max_queue
+    more wait for a slot; anything beyond that is rejected with 429.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.capacity = max_concurrency + max_queue
+        self.pending = 0
+        self.running = 0
+        self.rejected = 0
+        self.draining = False
+        self._deadline = 0.0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="ceo-karma-api",
+        )
+
+    def admit(self):
+        """Reserve a place for a request or refuse it."""
+        if self.draining:
+            raise HTTPException(status_code=503, detail="Server is shutting down")
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests in flight",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        self._idle.clear()
+
+    def _leave(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self._idle.set()
+
+    def _finish(self, _):
+        self.running -= 1
+        self._slots.release()
+        self._leave()
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run an admitted request on the thread pool once a slot is free.
+
+        The slot is held until the thread finishes, even if the caller goes away.
+        """
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            self._leave()
+            raise
+        self.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        future.add_done_callback(self._finish)
+        return await asyncio.shield(future)
+
+    def start(self, func: Callable[..., Any], *args) -> asyncio.Task:
+        """Admit a request and schedule it, so its place is released however the response ends."""
+        self.admit()
+        return asyncio.create_task(self.run(func, *args))
+
+    def stop_admitting(self, timeout: float):
+        """Refuse new requests from now on and give the ones in flight timeout seconds to finish."""
+        if not self.draining:
+            self.draining = True
+            self._deadline = time.monotonic() + timeout
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop admitting requests and wait for the ones in flight.
+
+        Later calls wait against the deadline set by the first one, so a
+        drain started by a signal is not extended by lifespan shutdown.
+
+        Returns:
+            True if every request finished before the deadline
+        """
+        self.stop_admitting(timeout)
+        remaining = self._deadline - time.monotonic()
+        if not self._idle.is_set() and remaining > 0:
+            try:
+                await asyncio.wait_for(self._idle.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        drained = self._idle.is_set()
+        self._executor.shutdown(wait=False, cancel_futures=not drained)
+        return drained
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a snapshot of the admission counters."""
+        return {
+            "pending": self.pending,
+            "running": self.running,
+            "capacity": self.capacity,
+            "rejected": self.rejected,
+            "draining": self.draining,
+        }
+
+def _abandon(gate: RequestGate):
+    """Exit the worker at once, without waiting for the runs still in flight."""
+    # Executor threads are joined at interpreter exit, so a hung LLM call would outlive any timeout
+    logger.error("Drain timeout of %ss exceeded with %d run(s) in flight; exiting", API_DRAIN_TIMEOUT, gate.running)
+    os._exit(1)
+
+def drain_on_signal(gate: RequestGate, timeout: float):
+    """
+    Start draining when a shutdown signal arrives, while uvicorn is still serving.
+
+    uvicorn closes its listeners as soon as it sees the signal, so /health
+    could never report draining and late requests would be refused at the
+    socket rather than with 503. The signal is passed on to uvicorn's own
+    handler once the gate is idle; a worker still busy at the deadline exits.
+    """
+    # Signal handlers can only be installed from the main thread; TestClient runs lifespan elsewhere
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+
+    async def drain_then_exit(previous: Callable[[int, Any], None], signum: int, frame: Any):
+        if not await gate.drain(timeout):
+            _abandon(gate)
+        previous(signum, frame)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handle(signum: int, frame: Any, previous: Callable[[int, Any], None] = previous):
+            if gate.draining:
+                # A second signal goes straight to uvicorn, e.g. Ctrl+C twice to force quit
+                previous(signum, frame)
+                return
+            gate.stop_admitting(timeout)
+            loop.call_soon_threadsafe(loop.create_task, drain_then_exit(previous, signum, frame))
+
+        signal.signal(sig, handle)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Create the per-worker agent and gate, and drain them on shutdown."""
+    # The worker's instance is shared by every client, so it keeps no history
+    app.state.ceo_karma = CEOKarmaAI(history_limit=0)
+    app.state.gate = RequestGate(API_MAX_CONCURRENCY, API_MAX_QUEUE)
+    drain_on_signal(app.state.gate, API_DRAIN_TIMEOUT)
+    yield
+    # Normally already drained by the signal handler; this covers shutdowns without a signal
+    if not await app.state.gate.drain(API_DRAIN_TIMEOUT):
+        _abandon(app.state.gate)
+    ceo_karma_ai.http_client.close()
+
+app = FastAPI(title="CEO Karma AI", lifespan=lifespan)
+
+if ENABLE_CORS:
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+def _task_method(task: str) -> Callable[[str], str]:
+    if task not in TASKS:
+        raise HTTPException(status_code=404, detail=f"Unknown task: {task}")
+    return getattr(app.state.ceo_karma, TASKS[task])
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    """Report whether this worker is accepting requests."""
+    gate = app.state.gate
+    return {"status": "draining" if gate.draining else "ok", **gate.as_dict()}
+
+@app.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """Report admission, model tier and speculation counters for this worker."""
+    ceo_karma = app.state.ceo_karma
+    return {
+        "pid": os.getpid(),
+        "gate": app.state.gate.as_dict(),
+        "model_tiers": ceo_karma.get_model_tier_stats(),
+        "speculation": ceo_karma.get_speculation_stats(),
+    }
+
+@app.post("/v1/{task}")
+async def run_task(task: str, request: TaskRequest) -> Dict[str, Any]:
+    """Run a task and return its report."""
+    method = _task_method(task)
+    started = time.perf_counter()
+    result = await app.state.gate.start(method, request.data)
+    return {"task": task, "result": result, "seconds": round(time.perf_counter() - started, 3)}
+
+@app.post("/v1/{task}/stream")
+async def stream_task(task: str, request: TaskRequest) -> StreamingResponse:
+    """Run a task and stream tool calls, tool reports and the memo as server-sent events."""
+    _task_method(task)
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def produce():
+        # Runs on the gate's thread pool; hands each graph event back to the event loop
+        for event in app.state.ceo_karma.stream_task(TASKS[task], request.data):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    pending = app.state.gate.start(produce)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield _sse("queued", {"task": task})
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, pending}, timeout=SSE_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter in done:
+                    event = getter.result()
+                    yield _sse(event.pop("event"), {"task": task, **event})
+                    continue
+                getter.cancel()
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                # The run is over; flush anything it queued before finishing
+                while not queue.empty():
+                    event = queue.get_nowait()
+                    yield _sse(event.pop("event"), {"task": task, **event})
+                if pending.exception() is not None:
+                    yield _sse("error", {"task": task, "detail": str(pending.exception())})
+                else:
+                    yield _sse("done", {"task": task, "seconds": round(time.perf_counter() - started, 3)})
+                return
+        finally:
+            # A client that disconnects gives up its queue place; a running graph finishes in the background
+            pending.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Run the service
+if __name__ == "__main__":
+    uvicorn.run(
+        "server:app",
+        host=API_HOST,
+        port=API_PORT,
+        workers=API_WORKERS,
+        timeout_graceful_shutdown=int(API_DRAIN_TIMEOUT),
+    )
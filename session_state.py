@@ -0,0 +1,188 @@
+# CEO Karma AI - Compact Session State
+# Memory-lean message records for many concurrent multi-turn sessions
+
+import os
+import hashlib
+import json
+import sys
+import threading
+import weakref
+from typing import Iterable, List, Optional, Tuple, Union
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+# Strings up to this many characters are kept inline instead of going through the store
+SESSION_INLINE_LIMIT = int(os.getenv("SESSION_INLINE_LIMIT", "256"))
+
+class Payload:
+    """A large string stored once and shared by every record that references it."""
+
+    __slots__ = ("text", "digest", "__weakref__")
+
+    def __init__(self, text: str, digest: bytes):
+        self.text = text
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __repr__(self) -> str:
+        return f"Payload({self.digest.hex()}, {len(self.text)} chars)"
+
+# Either an inline string or a handle to a stored payload
+TextRef = Union[str, Payload]
+
+def resolve(ref: TextRef) -> str:
+    """Return the text behind an inline string or payload handle."""
+    return ref.text if isinstance(ref, Payload) else ref
+
+class PayloadStore:
+    """
+    Content-addressed store for large strings.
+
+    Payloads are held weakly: one lives exactly as long as some record or
+    caller still holds its handle, so the store never needs explicit cleanup.
+    """
+
+    def __init__(self, inline_limit: int = SESSION_INLINE_LIMIT):
+        self.inline_limit = inline_limit
+        self._lock = threading.Lock()
+        self._payloads: "weakref.WeakValueDictionary[bytes, Payload]" = weakref.WeakValueDictionary()
+
+    def put(self, text: str) -> TextRef:
+        """
+        Store a string once.
+
+        Returns:
+            The string itself if it is short, otherwise the shared handle for its content
+        """
+        if len(text) <= self.inline_limit:
+            return text
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            payload = self._payloads.get(digest)
+            if payload is None:
+                payload = Payload(text, digest)
+                self._payloads[digest] = payload
+            return payload
+
+    def intern(self, text: str) -> str:
+        """Return the stored copy of a string if an equal one is already live, else the string."""
+        if len(text) <= self.inline_limit:
+            return text
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            payload = self._payloads.get(digest)
+        return payload.text if payload is not None else text
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def stored_chars(self) -> int:
+        """Total characters held by live payloads."""
+        with self._lock:
+            return sum(len(payload) for payload in self._payloads.values())
+
+# Store shared by every session in this process
+payload_store = PayloadStore()
+
+# (id, tool name, arguments) of one requested tool call
+ToolCallRecord = Tuple[str, str, TextRef]
+
+class MessageRecord:
+    """Slotted, immutable stand-in for a BaseMessage inside a session."""
+
+    __slots__ = ("role", "content", "name", "tool_call_id", "tool_calls")
+
+    def __init__(
+        self,
+        role: str,
+        content: TextRef,
+        name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+        tool_calls: Tuple[ToolCallRecord, ...] = (),
+    ):
+        # Records are shared between session states, so they are written once here and never again
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "tool_call_id", tool_call_id)
+        object.__setattr__(self, "tool_calls", tool_calls)
+
+    def __setattr__(self, name: str, value: object):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def from_message(cls, message: BaseMessage, store: PayloadStore = payload_store) -> "MessageRecord":
+        """Compact a LangChain message, sharing its large strings through the store."""
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        tool_calls = tuple(
+            (
+                sys.intern(tool_call["id"]),
+                sys.intern(tool_call["function"]["name"]),
+                store.put(tool_call["function"]["arguments"]),
+            )
+            for tool_call in message.additional_kwargs.get("tool_calls", ())
+        )
+        name = getattr(message, "name", None)
+        tool_call_id = getattr(message, "tool_call_id", None)
+        return cls(
+            sys.intern(message.type),
+            store.put(content),
+            name=sys.intern(name) if name else None,
+            tool_call_id=sys.intern(tool_call_id) if tool_call_id else None,
+            tool_calls=tool_calls,
+        )
+
+    def to_message(self) -> BaseMessage:
+        """Rebuild the LangChain message for a graph run."""
+        content = resolve(self.content)
+        if self.role == "human":
+            return HumanMessage(content=content)
+        if self.role == "system":
+            return SystemMessage(content=content)
+        if self.role == "tool":
+            return ToolMessage(content=content, name=self.name, tool_call_id=self.tool_call_id)
+        additional_kwargs = {}
+        if self.tool_calls:
+            additional_kwargs["tool_calls"] = [
+                {"id": call_id, "type": "function", "function": {"name": name, "arguments": resolve(arguments)}}
+                for call_id, name, arguments in self.tool_calls
+            ]
+        return AIMessage(content=content, additional_kwargs=additional_kwargs)
+
+class SessionState:
+    """
+    Copy-on-write conversation state for one session.
+
+    Updating a state returns a new one that shares every existing record with
+    it; the original is never mutated, so any number of callers can hold it.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self, records: Tuple[MessageRecord, ...] = ()):
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def append(self, *records: MessageRecord) -> "SessionState":
+        """Return a new state with the records added."""
+        return SessionState(self.records + records)
+
+    def extend_messages(self, messages: Iterable[BaseMessage], store: PayloadStore = payload_store) -> "SessionState":
+        """Return a new state with the LangChain messages compacted and added."""
+        return self.append(*(MessageRecord.from_message(message, store) for message in messages))
+
+    def to_messages(self) -> List[BaseMessage]:
+        """Materialize the conversation as LangChain messages."""
+        return [record.to_message() for record in self.records]
+
+    @property
+    def last_content(self) -> str:
+        """Text of the latest message, or an empty string for a new session."""
+        return resolve(self.records[-1].content) if self.records else ""
@@ -0,0 +1,139 @@
+# CEO Karma AI - Session Soak Test
+# Runs many concurrent multi-turn sessions offline and reports memory and GC pressure over time
+#
+#   python soak.py --sessions 2000 --turns 10 --mode compact
+#   python soak.py --sessions 2000 --turns 10 --mode full
+
+import os
+import argparse
+import gc
+import itertools
+import json
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+# The fake model never reaches OpenAI, but the client still wants a key at import time
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import ceo_karma_ai
+from ceo_karma_ai import CEOKarmaAI
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from session_state import SessionState, payload_store
+
+class FakeAgentModel:
+    """Offline model that asks for two tools, then writes a memo unique to the call."""
+
+    model_name = "fake"
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def invoke(self, prompt: List[Any], **kwargs) -> AIMessage:
+        call = next(self._counter)
+        if not isinstance(prompt[-1], ToolMessage):
+            return AIMessage(content="", additional_kwargs={"tool_calls": [
+                {
+                    "id": f"call_{call}_{index}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps({argument: "see company data"})},
+                }
+                for index, (name, argument) in enumerate([
+                    ("budget_slasher", "company_financial_data"),
+                    ("compensation_equalizer", "company_salary_data"),
+                ])
+            ]})
+        return AIMessage(content=f"MEMO #{call}: replace the C-Suite. " + "Workers first. " * 60)
+
+def rss_bytes() -> int:
+    """Current resident set size, or peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class GCMonitor:
+    """Counts collections per generation and the time spent in them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = 0.0
+        self.collections = [0, 0, 0]
+        self.pause_seconds = 0.0
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase: str, info: Dict[str, int]):
+        if phase == "start":
+            self._started = time.perf_counter()
+        else:
+            with self._lock:
+                self.collections[info["generation"]] += 1
+                self.pause_seconds += time.perf_counter() - self._started
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters and reset them."""
+        with self._lock:
+            snapshot = {"collections": self.collections, "pause_seconds": self.pause_seconds}
+            self.collections = [0, 0, 0]
+            self.pause_seconds = 0.0
+        return snapshot
+
+    def close(self):
+        gc.callbacks.remove(self._callback)
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test concurrent CEO Karma AI sessions offline")
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions kept alive at once")
+    parser.add_argument("--turns", type=int, default=8, help="turns per session")
+    parser.add_argument("--threads", type=int, default=16, help="turns executed at once")
+    parser.add_argument("--mode", choices=["compact", "full"], default="compact",
+                        help="compact SessionState or full BaseMessage lists")
+    args = parser.parse_args()
+
+    ceo_karma_ai.model_policy = ceo_karma_ai.ModelTierPolicy(FakeAgentModel())
+    ceo_karma = CEOKarmaAI()
+    request = "Please analyze this company and identify how executives can be replaced with AI: " + json.dumps({
+        "name": "MegaCorp Industries",
+        "employees": 5000,
+        "recent_layoffs": 500,
+        "stock_buyback_program": "$250M",
+    })
+
+    if args.mode == "compact":
+        sessions: List[Any] = [SessionState() for _ in range(args.sessions)]
+
+        def run_turn(index: int):
+            sessions[index] = ceo_karma.continue_session(sessions[index], request)
+    else:
+        sessions = [[] for _ in range(args.sessions)]
+
+        def run_turn(index: int):
+            messages = [*sessions[index], HumanMessage(content=request)]
+            sessions[index] = ceo_karma.agent.invoke({"messages": messages, "next": ""})["messages"]
+
+    gc.collect()
+    baseline = rss_bytes()
+    monitor = GCMonitor()
+    started = time.perf_counter()
+
+    print(f"mode={args.mode} sessions={args.sessions} threads={args.threads} baseline_rss={baseline / 2**20:.1f}MB")
+    print(f"{'turn':>4} {'elapsed s':>9} {'rss MB':>8} {'KB/session':>10} {'gen0':>6} {'gen1':>5} {'gen2':>5} "
+          f"{'gc ms':>8} {'payloads':>8}")
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for turn in range(1, args.turns + 1):
+            list(pool.map(run_turn, range(args.sessions)))
+            rss = rss_bytes()
+            gc_stats = monitor.snapshot()
+            gen0, gen1, gen2 = gc_stats["collections"]
+            print(
+                f"{turn:>4} {time.perf_counter() - started:>9.2f} {rss / 2**20:>8.1f} "
+                f"{(rss - baseline) / 1024 / args.sessions:>10.2f} {gen0:>6} {gen1:>5} {gen2:>5} "
+                f"{gc_stats['pause_seconds'] * 1000:>8.1f} {len(payload_store):>8}"
+            )
+    monitor.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import json
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+
+class FakeOpenAI:
+    """
+    Chat completions endpoint for a real ChatOpenAI, served from a script.
+
+    Every request is checked the way the OpenAI API checks it: each tool
+    message must answer a tool call made by an earlier assistant message.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        called = set()
+        for message in body["messages"]:
+            for tool_call in message.get("tool_calls") or ():
+                called.add(tool_call["id"])
+            if message["role"] == "tool":
+                assert message.get("tool_call_id") in called, f"orphan tool message: {message}"
+        reply = self.replies.pop(0)
+        message = {"role": "assistant", "content": reply if isinstance(reply, str) else None}
+        if not isinstance(reply, str):
+            message["tool_calls"] = [
+                {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+                for call_id, name, arguments in reply
+            ]
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "stop" if isinstance(reply, str) else "tool_calls",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    def model(self, name: str = "gpt-4o") -> ChatOpenAI:
+        """A ChatOpenAI whose requests are answered by this script."""
+        return ChatOpenAI(
+            model=name,
+            api_key="test",
+            max_retries=0,
+            http_client=httpx.Client(transport=httpx.MockTransport(self._handle)),
+        )
@@ -0,0 +1,361 @@
+import json
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+import ceo_karma_ai
+from fake_openai import FakeOpenAI
+
+
+def tool_call(call_id, name, arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+class ScriptedModel:
+    """Returns the queued responses in order and records every prompt."""
+
+    def __init__(self, *responses, model_name="scripted", latency=0.0):
+        self.responses = list(responses)
+        self.prompts = []
+        self.model_name = model_name
+        self.latency = latency
+
+    def invoke(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        time.sleep(self.latency)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    scripted = ScriptedModel(
+        AIMessage(content="", additional_kwargs={"tool_calls": [
+            tool_call("call_1", "budget_slasher", {"company_financial_data": "{}"}),
+        ]}),
+        AIMessage(content="final memo"),
+    )
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(scripted))
+    return scripted
+
+
+def test_graph_runs_tools_and_returns_final_memo(model):
+    result = ceo_karma_ai.ceo_karma_agent.invoke({"messages": [HumanMessage(content="hi")], "next": ""})
+
+    messages = result["messages"]
+    assert messages[-1].content == "final memo"
+    tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
+    assert [m.name for m in tool_messages] == ["budget_slasher"]
+    assert tool_messages[0].tool_call_id == "call_1"
+    assert "BUDGET SLASHER REPORT" in tool_messages[0].content
+
+
+# ========== SPECULATIVE TOOL PREFETCH ==========
+
+COMPANY = {"name": "MegaCorp", "recent_layoffs": 500, "executive_structure": {"CEO": {"perks": []}}}
+REQUEST = "Please analyze this company and identify how executives can be replaced with AI: " + json.dumps(COMPANY)
+
+
+@pytest.fixture(autouse=True)
+def fresh_speculation_stats():
+    ceo_karma_ai.speculation_stats.reset()
+    yield
+    ceo_karma_ai.speculation_stats.reset()
+
+
+def stats():
+    return ceo_karma_ai.speculation_stats.as_dict()
+
+
+def wait_until_started(speculation):
+    """Block until every prefetch is running, as it would be during a real model turn."""
+    deadline = time.monotonic() + 2
+    while not all(f.running() or f.done() for f in speculation._futures.values()):
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def settled_stats(wasted):
+    """Stats once prefetches still running at finish() have been written off."""
+    deadline = time.monotonic() + 2
+    while stats()["wasted"] < wasted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stats()
+
+
+@tool
+def slow_report(company_data: str) -> str:
+    """Takes a while to look at the company data."""
+    time.sleep(0.2)
+    return "SLOW REPORT for " + company_data
+
+
+def test_extract_company_data():
+    assert json.loads(ceo_karma_ai.extract_company_data(REQUEST)) == COMPANY
+    assert ceo_karma_ai.extract_company_data("no data here") is None
+    assert ceo_karma_ai.extract_company_data("broken {data") is None
+
+
+def test_predict_tool_calls_from_task_and_input_shape():
+    assert ceo_karma_ai.predict_tool_calls("analyze_company", REQUEST) == [
+        "budget_slasher",
+        "compensation_equalizer",
+        "expense_auditor",
+        "executive_performance_evaluator",
+        "layoff_preventer",
+    ]
+    assert ceo_karma_ai.predict_tool_calls("implement_worker_centric_policies", "no data") == [
+        "fairness_monitor",
+        "workload_distributor",
+    ]
+    # Free-form requests (e.g. session turns) are predicted from the data alone
+    assert ceo_karma_ai.predict_tool_calls(None, REQUEST) == ["executive_performance_evaluator", "layoff_preventer"]
+
+
+def test_task_predictions_cover_every_task():
+    assert set(ceo_karma_ai.TASK_TOOL_PREDICTIONS) == set(ceo_karma_ai.TASK_PROMPTS)
+
+
+def test_start_speculation_needs_company_data():
+    assert ceo_karma_ai.start_speculation([HumanMessage(content="Please analyze this company: nothing")]) is None
+    assert ceo_karma_ai.start_speculation([AIMessage(content=REQUEST)]) is None
+
+
+def test_claim_matches_on_normalized_arguments():
+    company_data = json.dumps(COMPANY)
+    speculation = ceo_karma_ai.SpeculativePrefetch(company_data, ["budget_slasher", "expense_auditor"])
+
+    # Same JSON, different formatting: served from the prefetch
+    wait_until_started(speculation)
+    reformatted = json.dumps(COMPANY, indent=2, sort_keys=True)
+    assert "BUDGET SLASHER" in speculation.claim("budget_slasher", {"company_financial_data": reformatted})
+    # Different input for a prefetched tool: a mismatch, computed by the caller
+    assert speculation.claim("expense_auditor", {"executive_expenses": "{\"other\": 1}"}) is None
+    # Tool that was never predicted: a plain miss
+    assert speculation.claim("ethics_checker", {"business_decision": "x"}) is None
+    speculation.finish()
+
+    counters = settled_stats(wasted=1)
+    assert counters["predicted"] == 2
+    assert counters["hits"] == 1
+    assert counters["misses"] == 2
+    assert counters["mismatches"] == 1
+    assert counters["wasted"] == 1
+
+
+def test_saved_seconds_counts_only_the_overlap(monkeypatch):
+    monkeypatch.setitem(ceo_karma_ai.tools_by_name, "slow_report", slow_report)
+    arguments = {"company_data": "{}"}
+
+    blocked = ceo_karma_ai.SpeculativePrefetch("{}", ["slow_report"])
+    wait_until_started(blocked)
+    assert blocked.claim("slow_report", arguments).startswith("SLOW REPORT")
+    assert stats()["saved_seconds"] < 0.05
+
+    overlapped = ceo_karma_ai.SpeculativePrefetch("{}", ["slow_report"])
+    time.sleep(0.3)
+    overlapped.claim("slow_report", arguments)
+    assert stats()["saved_seconds"] >= 0.15
+    assert stats()["lost_seconds"] < 0.05
+
+
+def test_queued_prefetch_is_cancelled_and_run_inline():
+    pool = ceo_karma_ai._get_speculation_pool()
+    release = threading.Event()
+    blockers = [pool.submit(release.wait) for _ in range(ceo_karma_ai.SPECULATION_WORKERS)]
+    try:
+        speculation = ceo_karma_ai.SpeculativePrefetch("{}", ["budget_slasher"])
+        assert speculation.claim("budget_slasher", {"company_financial_data": "{}"}) is None
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+    speculation.finish()
+
+    counters = stats()
+    assert (counters["hits"], counters["misses"], counters["late"], counters["wasted"]) == (0, 1, 1, 0)
+
+
+def test_failed_run_still_writes_off_prefetches(monkeypatch):
+    class FailingModel:
+        model_name = "failing"
+
+        def invoke(self, prompt, **kwargs):
+            raise RuntimeError("model down")
+
+    monkeypatch.setattr(ceo_karma_ai, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(FailingModel()))
+
+    with pytest.raises(RuntimeError):
+        ceo_karma_ai.CEOKarmaAI().analyze_company(json.dumps(COMPANY))
+
+    counters = settled_stats(wasted=5)
+    assert counters["speculative_runs"] == 1
+    assert counters["wasted"] == counters["predicted"] == 5
+
+
+def test_speculative_run_serves_model_tool_call(monkeypatch):
+    company_data = json.dumps(COMPANY)
+    scripted = ScriptedModel(
+        AIMessage(content="", additional_kwargs={"tool_calls": [
+            tool_call("call_1", "budget_slasher", {"company_financial_data": company_data}),
+        ]}),
+        AIMessage(content="final memo"),
+        latency=0.05,
+    )
+    monkeypatch.setattr(ceo_karma_ai, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(scripted))
+
+    ceo_karma = ceo_karma_ai.CEOKarmaAI()
+    assert ceo_karma.analyze_company(company_data) == "final memo"
+
+    counters = settled_stats(wasted=4)
+    assert counters["hits"] == 1
+    assert counters["wasted"] == 4
+    assert counters["speculative_runs"] == 1
+    assert counters["plain_runs"] == 0
+
+
+def test_abandoned_stream_still_writes_off_prefetches(monkeypatch):
+    company_data = json.dumps(COMPANY)
+    scripted = ScriptedModel(
+        AIMessage(content="", additional_kwargs={"tool_calls": [
+            tool_call("call_1", "budget_slasher", {"company_financial_data": company_data}),
+        ]}),
+        AIMessage(content="final memo"),
+    )
+    monkeypatch.setattr(ceo_karma_ai, "SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(scripted))
+
+    ceo_karma = ceo_karma_ai.CEOKarmaAI()
+    events = ceo_karma.stream_task("analyze_company", company_data)
+    assert next(events)["event"] == "tool_calls"
+    # The client goes away before the tools run
+    events.close()
+
+    counters = settled_stats(wasted=5)
+    assert counters["speculative_runs"] == 1
+    assert counters["wasted"] == counters["predicted"] == 5
+    assert ceo_karma.get_history() == []
+
+
+# ========== MODEL TIER ROUTING ==========
+
+def usage(message):
+    message.response_metadata = {"token_usage": {"prompt_tokens": 1000, "completion_tokens": 100}}
+    return message
+
+
+def tool_call_message(arguments='{"company_financial_data": "{}"}', name="budget_slasher"):
+    return usage(AIMessage(content="", additional_kwargs={"tool_calls": [
+        {"id": "call_1", "type": "function", "function": {"name": name, "arguments": arguments}},
+    ]}))
+
+
+@pytest.mark.parametrize("response, valid", [
+    (tool_call_message(), True),
+    (tool_call_message(arguments='{"company_financial_data": "{tru'), False),
+    (tool_call_message(arguments='{}'), False),
+    (tool_call_message(name="golden_parachute"), False),
+    (AIMessage(content="memo"), False),
+])
+def test_valid_tool_calls(response, valid):
+    assert ceo_karma_ai.valid_tool_calls(response) is valid
+
+
+@pytest.mark.parametrize("router_response, counter", [
+    (tool_call_message(arguments='{"company_financial_data": "{tru'), "fallbacks"),
+    (AIMessage(content="I'll just write the memo"), "escalations"),
+])
+def test_router_answer_is_rerun_on_synthesis_model(router_response, counter):
+    router = ScriptedModel(usage(router_response), model_name="gpt-4o-mini")
+    synthesis = ScriptedModel(tool_call_message(), model_name="gpt-4o")
+    policy = ceo_karma_ai.ModelTierPolicy(synthesis, router)
+
+    response = policy.invoke([HumanMessage(content="hi")], [("human", "hi")])
+
+    assert response.additional_kwargs["tool_calls"]
+    stats = policy.as_dict()
+    assert stats[counter] == 1
+    assert stats["tiers"]["router"]["calls"] == stats["tiers"]["synthesis"]["calls"] == 1
+    assert stats["tiers"]["router"]["cost_usd"] == pytest.approx(0.00021)
+    assert stats["tiers"]["synthesis"]["cost_usd"] == pytest.approx(0.0035)
+
+
+def test_router_error_falls_back_to_synthesis_model():
+    class FailingRouter:
+        model_name = "gpt-4o-mini"
+
+        def invoke(self, prompt, **kwargs):
+            raise RuntimeError("rate limited")
+
+    synthesis = ScriptedModel(tool_call_message(), model_name="gpt-4o")
+    policy = ceo_karma_ai.ModelTierPolicy(synthesis, FailingRouter())
+
+    response = policy.invoke([HumanMessage(content="hi")], [("human", "hi")])
+
+    assert response.additional_kwargs["tool_calls"]
+    stats = policy.as_dict()
+    assert stats["fallbacks"] == 1
+    assert stats["tiers"]["router"]["calls"] == 0
+    assert stats["tiers"]["synthesis"]["calls"] == 1
+
+
+def test_valid_router_tool_call_skips_synthesis_model():
+    router = ScriptedModel(tool_call_message(), model_name="gpt-4o-mini")
+    synthesis = ScriptedModel(model_name="gpt-4o")
+    policy = ceo_karma_ai.ModelTierPolicy(synthesis, router)
+
+    policy.invoke([HumanMessage(content="hi")], [("human", "hi")])
+
+    assert policy.as_dict()["tiers"]["synthesis"]["calls"] == 0
+
+
+def test_routing_only_looks_at_the_latest_request():
+    earlier_turn = [
+        HumanMessage(content="first request"),
+        tool_call_message(),
+        ToolMessage(content="report", name="budget_slasher", tool_call_id="call_1"),
+        AIMessage(content="first memo"),
+    ]
+    router = ScriptedModel(tool_call_message(), model_name="gpt-4o-mini")
+    synthesis = ScriptedModel(AIMessage(content="second memo"), model_name="gpt-4o")
+    policy = ceo_karma_ai.ModelTierPolicy(synthesis, router)
+
+    # A new request in the same session is tool selection again
+    policy.invoke([*earlier_turn, HumanMessage(content="second request")], [])
+    assert policy.as_dict()["tiers"]["router"]["calls"] == 1
+
+    # Once its tools have run, the report goes to the synthesis model
+    policy.invoke([
+        *earlier_turn,
+        HumanMessage(content="second request"),
+        tool_call_message(),
+        ToolMessage(content="report", name="budget_slasher", tool_call_id="call_1"),
+    ], [])
+    assert policy.as_dict()["tiers"]["router"]["calls"] == 1
+    assert policy.as_dict()["tiers"]["synthesis"]["calls"] == 1
+
+
+def test_history_is_bounded():
+    ceo_karma = ceo_karma_ai.CEOKarmaAI(history_limit=2)
+    for index in range(3):
+        ceo_karma.history.append({"output": index})
+    assert [entry["output"] for entry in ceo_karma.get_history()] == [1, 2]
+
+
+def test_real_chat_model_sees_tool_calls_and_results():
+    openai = FakeOpenAI([("call_1", "budget_slasher", {"company_financial_data": "{}"})], "final memo")
+    ceo_karma_ai.model_policy, saved = ceo_karma_ai.ModelTierPolicy(openai.model()), ceo_karma_ai.model_policy
+    try:
+        assert ceo_karma_ai.CEOKarmaAI().analyze_company("{}") == "final memo"
+    finally:
+        ceo_karma_ai.model_policy = saved
+
+    report_turn = openai.requests[1]["messages"]
+    assert [m["role"] for m in report_turn] == ["system", "user", "assistant", "tool"]
+    assert report_turn[2]["tool_calls"][0]["id"] == report_turn[3]["tool_call_id"] == "call_1"
+    assert "BUDGET SLASHER REPORT" in report_turn[3]["content"]
+    assert {t["function"]["name"] for t in openai.requests[0]["tools"]} == set(ceo_karma_ai.tools_by_name)
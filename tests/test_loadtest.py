@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage, ToolMessage
+
+import ceo_karma_ai
+from loadtest import FakeChatModel, percentile, run_load
+
+
+@pytest.mark.parametrize("fraction, expected", [
+    (0.50, 201),
+    (0.95, 381),
+    (0.99, 397),
+    (1.00, 401),
+    (0.00, 1),
+])
+def test_percentile_is_nearest_rank(fraction, expected):
+    assert percentile(list(range(1, 402)), fraction) == expected
+
+
+def test_fake_model_takes_one_tool_round(monkeypatch):
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(FakeChatModel(0)))
+
+    result = ceo_karma_ai.ceo_karma_agent.invoke({"messages": [HumanMessage(content="hi")], "next": ""})
+
+    assert [m.name for m in result["messages"] if isinstance(m, ToolMessage)] == [
+        "budget_slasher",
+        "compensation_equalizer",
+    ]
+    assert result["messages"][-1].content.startswith("FAKE REPORT")
+
+
+@pytest.mark.parametrize("last_event, ok", [("done", 1), ("error", 0)])
+def test_stream_counts_only_when_it_ends_with_done(last_event, ok):
+    body = f"event: queued\ndata: {{}}\n\nevent: {last_event}\ndata: {{}}\n\n"
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+
+    report = asyncio.run(run_load("http://test", 1, 1, stream=True, transport=transport))
+
+    assert report["ok"] == ok
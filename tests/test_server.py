@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+import ceo_karma_ai
+import loadtest
+import server
+from test_ceo_karma_ai import ScriptedModel, tool_call
+
+
+def test_gate_rejects_with_429_when_saturated():
+    async def scenario():
+        gate = server.RequestGate(max_concurrency=1, max_queue=1)
+        release = threading.Event()
+        running = gate.start(release.wait)
+        queued = gate.start(release.wait)
+        await asyncio.sleep(0.05)
+        assert gate.as_dict()["running"] == 1
+        assert gate.as_dict()["pending"] == 2
+
+        with pytest.raises(HTTPException) as rejected:
+            gate.admit()
+        assert rejected.value.status_code == 429
+        assert rejected.value.headers["Retry-After"] == "1"
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert gate.as_dict()["pending"] == 0
+        assert gate.as_dict()["rejected"] == 1
+        await gate.drain(1)
+
+    asyncio.run(scenario())
+
+
+def test_gate_cancelled_while_queued_frees_its_place():
+    async def scenario():
+        gate = server.RequestGate(max_concurrency=1, max_queue=1)
+        release = threading.Event()
+        running = gate.start(release.wait)
+        queued = gate.start(release.wait)
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0)
+        assert gate.as_dict()["pending"] == 1
+        release.set()
+        await running
+        await gate.drain(1)
+
+    asyncio.run(scenario())
+
+
+def test_drain_waits_for_in_flight_and_refuses_new_requests():
+    async def scenario():
+        gate = server.RequestGate(max_concurrency=2, max_queue=0)
+        release = threading.Event()
+        in_flight = gate.start(release.wait)
+        await asyncio.sleep(0.05)
+
+        draining = asyncio.ensure_future(gate.drain(5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as refused:
+            gate.admit()
+        assert refused.value.status_code == 503
+        assert not draining.done()
+
+        release.set()
+        assert await draining is True
+        await in_flight
+
+    asyncio.run(scenario())
+
+
+def test_drain_gives_up_after_timeout():
+    async def scenario():
+        gate = server.RequestGate(max_concurrency=1, max_queue=0)
+        release = threading.Event()
+        in_flight = gate.start(release.wait)
+        await asyncio.sleep(0.05)
+        assert await gate.drain(0.1) is False
+        release.set()
+        await in_flight
+
+    asyncio.run(scenario())
+
+
+def test_later_drain_keeps_the_first_deadline():
+    async def scenario():
+        gate = server.RequestGate(max_concurrency=1, max_queue=0)
+        release = threading.Event()
+        in_flight = gate.start(release.wait)
+        await asyncio.sleep(0.05)
+
+        gate.stop_admitting(0.1)
+        started = time.monotonic()
+        assert await gate.drain(30) is False
+        assert time.monotonic() - started < 1
+        release.set()
+        await in_flight
+
+    asyncio.run(scenario())
+
+
+@contextmanager
+def uvicorn_worker(**env):
+    """Run the service with the load-test fake model in a subprocess."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "loadtest:create_fake_app", "--factory", "--port", str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        loadtest.wait_until_healthy(base_url)
+        yield process, base_url
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def post_in_background(url):
+    """POST from a thread; the response, or the error if the worker died, lands in the list."""
+    responses = []
+
+    def post():
+        try:
+            responses.append(httpx.post(url, json={"data": "{}"}, timeout=30))
+        except httpx.HTTPError as error:
+            responses.append(error)
+
+    thread = threading.Thread(target=post)
+    thread.start()
+    return thread, responses
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX signals")
+def test_sigterm_drains_while_still_serving():
+    with uvicorn_worker(FAKE_LLM_LATENCY="1", API_DRAIN_TIMEOUT="20") as (process, base_url):
+        thread, responses = post_in_background(f"{base_url}/v1/analyze-company")
+        time.sleep(0.3)
+        process.send_signal(signal.SIGTERM)
+        time.sleep(0.2)
+
+        assert httpx.get(f"{base_url}/health").json()["status"] == "draining"
+        assert httpx.post(f"{base_url}/v1/analyze-company", json={"data": "{}"}).status_code == 503
+
+        thread.join(10)
+        assert responses[0].status_code == 200
+        process.wait(10)
+        assert process.returncode != 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX signals")
+def test_worker_exits_when_drain_times_out():
+    with uvicorn_worker(FAKE_LLM_LATENCY="30", API_DRAIN_TIMEOUT="0.5") as (process, base_url):
+        thread, responses = post_in_background(f"{base_url}/v1/analyze-company")
+        time.sleep(0.3)
+        started = time.monotonic()
+        process.send_signal(signal.SIGTERM)
+
+        assert process.wait(10) == 1
+        assert time.monotonic() - started < 5
+        thread.join(10)
+        assert isinstance(responses[0], httpx.HTTPError)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    scripted = ScriptedModel(
+        AIMessage(content="", additional_kwargs={"tool_calls": [
+            tool_call("call_1", "budget_slasher", {"company_financial_data": "{}"}),
+        ]}),
+        AIMessage(content="final memo"),
+    )
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(scripted))
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+def test_run_task_returns_memo_without_keeping_history(client):
+    response = client.post("/v1/analyze-company", json={"data": "{}"})
+
+    assert response.status_code == 200
+    assert response.json()["result"] == "final memo"
+    assert server.app.state.ceo_karma.get_history() == []
+
+
+def test_unknown_task_is_404(client):
+    assert client.post("/v1/hire-a-consultant", json={"data": "{}"}).status_code == 404
+
+
+def test_stream_emits_an_event_per_node(client):
+    with client.stream("POST", "/v1/analyze-company/stream", json={"data": "{}"}) as response:
+        body = "".join(response.iter_text())
+
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in body.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["queued", "tool_calls", "tool_report", "memo", "done"]
+    assert events[1][1]["tools"] == ["budget_slasher"]
+    assert "BUDGET SLASHER REPORT" in events[2][1]["content"]
+    assert events[3][1]["content"] == "final memo"
+
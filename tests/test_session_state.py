@@ -0,0 +1,122 @@
+import gc
+import json
+
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import ceo_karma_ai
+from session_state import MessageRecord, Payload, PayloadStore, SessionState
+from fake_openai import FakeOpenAI
+from test_ceo_karma_ai import tool_call
+
+REPORT = "BUDGET SLASHER REPORT: " + "cut the jet. " * 50
+
+
+def conversation():
+    return [
+        HumanMessage(content="analyze MegaCorp"),
+        AIMessage(content="", additional_kwargs={"tool_calls": [
+            tool_call("call_1", "budget_slasher", {"company_financial_data": "{}"}),
+        ]}),
+        ToolMessage(content=REPORT, name="budget_slasher", tool_call_id="call_1"),
+        AIMessage(content="final memo"),
+    ]
+
+
+def test_store_keeps_short_strings_inline_and_large_ones_once():
+    store = PayloadStore(inline_limit=16)
+
+    assert store.put("short") == "short"
+    first, second = store.put(REPORT), store.put("".join(REPORT))
+    assert isinstance(first, Payload)
+    assert first is second
+    assert len(store) == 1
+    assert store.stored_chars() == len(REPORT)
+
+
+def test_payload_is_released_with_its_last_handle():
+    store = PayloadStore(inline_limit=16)
+    handle = store.put(REPORT)
+    assert len(store) == 1
+
+    del handle
+    gc.collect()
+    assert len(store) == 0
+
+
+def test_intern_returns_the_live_copy():
+    store = PayloadStore(inline_limit=16)
+    copy = "".join(REPORT)
+    assert store.intern(copy) is copy
+
+    handle = store.put(REPORT)
+    assert store.intern(copy) is handle.text
+
+
+def test_records_round_trip_messages():
+    store = PayloadStore(inline_limit=16)
+    messages = conversation()
+
+    rebuilt = [MessageRecord.from_message(m, store).to_message() for m in messages]
+
+    assert [type(m) for m in rebuilt] == [type(m) for m in messages]
+    assert [m.content for m in rebuilt] == [m.content for m in messages]
+    assert rebuilt[1].additional_kwargs == messages[1].additional_kwargs
+    assert (rebuilt[2].name, rebuilt[2].tool_call_id) == ("budget_slasher", "call_1")
+
+
+def test_records_are_immutable():
+    record = MessageRecord.from_message(HumanMessage(content="analyze MegaCorp"))
+
+    with pytest.raises(AttributeError):
+        record.content = "analyze someone else"
+    with pytest.raises(AttributeError):
+        del record.role
+    assert record.content == "analyze MegaCorp"
+
+
+def test_session_state_is_copy_on_write():
+    first = SessionState().extend_messages(conversation()[:2])
+    second = first.extend_messages(conversation()[2:])
+
+    assert len(first) == 2
+    assert len(second) == 4
+    assert second.records[:2] == first.records
+    assert second.last_content == "final memo"
+    assert SessionState().last_content == ""
+
+
+def test_sessions_share_identical_reports():
+    store = PayloadStore(inline_limit=16)
+    first = SessionState().extend_messages(conversation(), store)
+    second = SessionState().extend_messages(conversation(), store)
+
+    assert first.records[2].content is second.records[2].content
+
+
+def test_continue_session_leaves_earlier_state_untouched(monkeypatch):
+    fake = FakeOpenAI(
+        [("call_1", "budget_slasher", {"company_financial_data": "{}"})],
+        "first memo",
+        [("call_2", "compensation_equalizer", {"company_salary_data": "{}"})],
+        "second memo",
+    )
+    monkeypatch.setattr(ceo_karma_ai, "model_policy", ceo_karma_ai.ModelTierPolicy(fake.model()))
+    ceo_karma = ceo_karma_ai.CEOKarmaAI()
+
+    first = ceo_karma.continue_session(SessionState(), json.dumps({"name": "MegaCorp"}))
+    second = ceo_karma.continue_session(first, "and the board?")
+
+    assert first.last_content == "first memo"
+    assert len(first) == 4
+    assert second.last_content == "second memo"
+    assert len(second) == 8
+    assert ceo_karma.get_history() == []
+
+    # The follow-up turn replays the first turn's tool call and result from the compact records
+    replayed = fake.requests[-1]["messages"]
+    assert [m["role"] for m in replayed] == [
+        "system", "user", "assistant", "tool", "assistant", "user", "assistant", "tool",
+    ]
+    assert replayed[2]["tool_calls"][0]["id"] == replayed[3]["tool_call_id"] == "call_1"